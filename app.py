@@ -6,12 +6,16 @@ task delegation, and collaborative problem-solving capabilities.
 """
 
 import asyncio
+import itertools
 import json
+import sys
+import time
 import uuid
-from abc import ABC, abstractmethod
+from abc import ABC
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, ClassVar, Deque, Dict, List, Optional
 from datetime import datetime
 import logging
 
@@ -22,8 +26,50 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# orjson is a faster drop-in for message serialization when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class AgentType(Enum):
+# Use uvloop's faster event loop when it is installed (not available on Windows)
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+# Upper bound for message/task queues; oldest entries are evicted first
+MAX_QUEUE_SIZE = 10_000
+
+# Maximum number of recycled Message objects kept for reuse
+MAX_MESSAGE_POOL_SIZE = 1024
+
+# Cheap unique IDs: a per-process prefix plus a monotonic counter
+_PROCESS_ID = uuid.uuid4().hex[:8]
+_ID_COUNTER = itertools.count()
+
+
+def _next_id() -> str:
+    """Generate a process-unique identifier"""
+    return f"{_PROCESS_ID}-{next(_ID_COUNTER)}"
+
+
+# __slots__ dataclasses drop the per-instance __dict__ (Python 3.10+)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+if sys.version_info >= (3, 11):
+    from enum import StrEnum
+else:
+    class StrEnum(str, Enum):
+        """Backport of enum.StrEnum: members print and format as their value"""
+
+        def __str__(self) -> str:
+            return str.__str__(self)
+
+
+class AgentType(StrEnum):
     """Enumeration of agent types"""
     RESEARCHER = "researcher"
     ANALYZER = "analyzer"
@@ -31,7 +77,7 @@ class AgentType(Enum):
     EXECUTOR = "executor"
 
 
-class MessageType(Enum):
+class MessageType(StrEnum):
     """Message types for inter-agent communication"""
     QUERY = "query"
     RESPONSE = "response"
@@ -40,39 +86,74 @@ class MessageType(Enum):
     STATUS = "status"
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Message:
     """Message structure for agent communication"""
-    message_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    message_id: str = field(default_factory=_next_id)
     message_type: MessageType = MessageType.QUERY
     sender_id: str = ""
     receiver_id: str = ""
     content: Dict[str, Any] = field(default_factory=dict)
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: int = field(default_factory=time.time_ns)  # ns since epoch
     priority: int = 1
+    # Set by acquire(); only pool-created messages are ever recycled
+    _pooled: bool = field(default=False, init=False, repr=False, compare=False)
+
+    # Free list of released messages, reused by acquire()
+    _pool: ClassVar[List["Message"]] = []
+
+    @classmethod
+    def acquire(cls, **fields) -> "Message":
+        """Get a message from the free list (or a new one) initialized with fields"""
+        message = cls._pool.pop() if cls._pool else cls.__new__(cls)
+        message.__init__(**fields)
+        message._pooled = True
+        return message
+
+    def release(self) -> None:
+        """Return an acquired message to the free list; it must not be used afterwards
+
+        Messages built directly with Message(...) and repeated releases are ignored.
+        """
+        if not self._pooled:
+            return
+        self._pooled = False
+        if len(Message._pool) < MAX_MESSAGE_POOL_SIZE:
+            Message._pool.append(self)
 
     def to_dict(self) -> Dict:
         """Convert message to dictionary"""
         return {
             'message_id': self.message_id,
-            'message_type': self.message_type.value,
+            'message_type': self.message_type,
             'sender_id': self.sender_id,
             'receiver_id': self.receiver_id,
             'content': self.content,
-            'timestamp': self.timestamp,
+            'timestamp': datetime.fromtimestamp(self.timestamp / 1e9).isoformat(),
             'priority': self.priority
         }
 
+    def to_json(self) -> bytes:
+        """Serialize message to JSON bytes"""
+        # Both backends emit compact UTF-8 JSON and stringify non-str keys
+        data = self.to_dict()
+        if orjson is not None:
+            try:
+                return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+            except orjson.JSONEncodeError:
+                pass  # e.g. ints wider than 64 bits, which json handles
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Task:
     """Task structure for agent execution"""
-    task_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    task_id: str = field(default_factory=_next_id)
     agent_id: str = ""
     action: str = ""
     parameters: Dict[str, Any] = field(default_factory=dict)
     status: str = "pending"
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    created_at: int = field(default_factory=time.time_ns)  # ns since epoch
     result: Optional[Dict] = None
 
 
@@ -80,24 +161,52 @@ class BaseAgent(ABC):
     """Base class for all agent types"""
 
     def __init__(self, agent_id: str, agent_type: AgentType):
+        if type(self) is BaseAgent:
+            raise TypeError("Can't instantiate abstract class BaseAgent")
         self.agent_id = agent_id
         self.agent_type = agent_type
-        self.message_queue: List[Message] = []
+        self.mailbox: "asyncio.Queue[Message]" = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
         self.knowledge_base: Dict[str, Any] = {}
-        self.task_history: List[Task] = []
+        self.task_history: Deque[Task] = deque(maxlen=MAX_QUEUE_SIZE)
         self.is_active = True
-        logger.info(f"Agent {self.agent_id} initialized as {agent_type.value}")
+        logger.info("Agent %s initialized as %s", self.agent_id, agent_type.value)
+
+    def receive_message(self, message: Message) -> bool:
+        """Receive a message from another agent; returns whether it was queued"""
+        if message.receiver_id != self.agent_id:
+            return False
+        try:
+            self.mailbox.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Agent %s mailbox full, dropping message %s",
+                           self.agent_id, message.message_id)
+            return False
+        logger.info("Agent %s received message %s", self.agent_id, message.message_id)
+        return True
 
-    def receive_message(self, message: Message) -> None:
-        """Receive a message from another agent"""
-        if message.receiver_id == self.agent_id:
-            self.message_queue.append(message)
-            logger.info(f"Agent {self.agent_id} received message {message.message_id}")
+    async def run(self, send: Optional[Callable[[Message], bool]] = None) -> None:
+        """Consume the mailbox until shutdown, replying to each message via send"""
+        while self.is_active:
+            message = await self.mailbox.get()
+            try:
+                response = await self.process_message(message)
+                # Never answer a response, or two agents would reply to each other forever
+                sent = (send is not None and message.message_type != MessageType.RESPONSE
+                        and send(response))
+                if not sent:
+                    response.release()
+                # Replies from process_message are pooled; release() ignores anything else
+                if message.message_type == MessageType.RESPONSE:
+                    message.release()
+            except Exception as e:
+                logger.error("Message processing failed: %s", e)
+            finally:
+                self.mailbox.task_done()
 
     async def process_message(self, message: Message) -> Message:
         """Process incoming message and generate response"""
-        logger.info(f"Processing message {message.message_id}")
-        response = Message(
+        logger.info("Processing message %s", message.message_id)
+        response = Message.acquire(
             message_type=MessageType.RESPONSE,
             sender_id=self.agent_id,
             receiver_id=message.sender_id,
@@ -108,7 +217,7 @@ class BaseAgent(ABC):
     async def execute_task(self, task: Task) -> Dict:
         """Execute assigned task"""
         task.status = "running"
-        logger.info(f"Agent {self.agent_id} executing task {task.task_id}")
+        logger.info("Agent %s executing task %s", self.agent_id, task.task_id)
         try:
             result = await self._perform_action(task.action, task.parameters)
             task.status = "completed"
@@ -117,13 +226,28 @@ class BaseAgent(ABC):
             return {'status': 'success', 'result': result}
         except Exception as e:
             task.status = "failed"
-            logger.error(f"Task execution failed: {str(e)}")
+            logger.error("Task execution failed: %s", e)
             return {'status': 'failed', 'error': str(e)}
 
-    @abstractmethod
+    # Action name -> handler, defined by each subclass unless it overrides _perform_action
+    _ACTIONS: ClassVar[Dict[str, Callable[["BaseAgent", Dict], Awaitable[Dict]]]]
+
+    def __init_subclass__(cls, abstract: bool = False, **kwargs):
+        """Require concrete agents to define _ACTIONS or override _perform_action
+
+        Pass abstract=True to declare an intermediate base class without either.
+        """
+        super().__init_subclass__(**kwargs)
+        if (not abstract and not hasattr(cls, '_ACTIONS')
+                and cls._perform_action is BaseAgent._perform_action):
+            raise TypeError(f"{cls.__name__} must define _ACTIONS or override _perform_action")
+
     async def _perform_action(self, action: str, parameters: Dict) -> Dict:
-        """Perform specific action (implemented by subclasses)"""
-        pass
+        """Perform specific action via the subclass action table (subclasses may override)"""
+        handler = self._ACTIONS.get(action)
+        if handler is None:
+            return {'action': action, 'status': 'unknown_action'}
+        return await handler(self, parameters)
 
     def get_status(self) -> Dict:
         """Get agent status"""
@@ -131,7 +255,7 @@ class BaseAgent(ABC):
             'agent_id': self.agent_id,
             'agent_type': self.agent_type.value,
             'is_active': self.is_active,
-            'message_queue_size': len(self.message_queue),
+            'message_queue_size': self.mailbox.qsize(),
             'task_history_count': len(self.task_history),
             'knowledge_base_size': len(self.knowledge_base)
         }
@@ -139,7 +263,7 @@ class BaseAgent(ABC):
     def shutdown(self) -> None:
         """Shutdown agent gracefully"""
         self.is_active = False
-        logger.info(f"Agent {self.agent_id} shutdown")
+        logger.info("Agent %s shutdown", self.agent_id)
 
 
 class ResearchAgent(BaseAgent):
@@ -149,18 +273,18 @@ class ResearchAgent(BaseAgent):
         super().__init__(agent_id, AgentType.RESEARCHER)
         self.data_sources = []
 
-    async def _perform_action(self, action: str, parameters: Dict) -> Dict:
+    async def _gather_data(self, parameters: Dict) -> Dict:
         """Perform research action"""
-        if action == "gather_data":
-            topic = parameters.get('topic', '')
-            logger.info(f"Gathering data on: {topic}")
-            return {
-                'action': 'gather_data',
-                'topic': topic,
-                'data': f"Research data for {topic}",
-                'sources': 5
-            }
-        return {'action': action, 'status': 'unknown_action'}
+        topic = parameters.get('topic', '')
+        logger.info("Gathering data on: %s", topic)
+        return {
+            'action': 'gather_data',
+            'topic': topic,
+            'data': f"Research data for {topic}",
+            'sources': 5
+        }
+
+    _ACTIONS = {'gather_data': _gather_data}
 
 
 class AnalysisAgent(BaseAgent):
@@ -169,19 +293,19 @@ class AnalysisAgent(BaseAgent):
     def __init__(self, agent_id: str):
         super().__init__(agent_id, AgentType.ANALYZER)
 
-    async def _perform_action(self, action: str, parameters: Dict) -> Dict:
+    async def _analyze_data(self, parameters: Dict) -> Dict:
         """Perform analysis action"""
-        if action == "analyze_data":
-            data = parameters.get('data', {})
-            depth = parameters.get('depth', 'basic')
-            logger.info(f"Analyzing data with depth: {depth}")
-            return {
-                'action': 'analyze_data',
-                'insights': f"Key insights from {depth} analysis",
-                'patterns': 3,
-                'confidence_score': 0.85
-            }
-        return {'action': action, 'status': 'unknown_action'}
+        data = parameters.get('data', {})
+        depth = parameters.get('depth', 'basic')
+        logger.info("Analyzing data with depth: %s", depth)
+        return {
+            'action': 'analyze_data',
+            'insights': f"Key insights from {depth} analysis",
+            'patterns': 3,
+            'confidence_score': 0.85
+        }
+
+    _ACTIONS = {'analyze_data': _analyze_data}
 
 
 class PlanningAgent(BaseAgent):
@@ -190,19 +314,19 @@ class PlanningAgent(BaseAgent):
     def __init__(self, agent_id: str):
         super().__init__(agent_id, AgentType.PLANNER)
 
-    async def _perform_action(self, action: str, parameters: Dict) -> Dict:
+    async def _create_strategy(self, parameters: Dict) -> Dict:
         """Perform planning action"""
-        if action == "create_strategy":
-            timeline = parameters.get('timeline', '1_month')
-            logger.info(f"Creating strategy for: {timeline}")
-            return {
-                'action': 'create_strategy',
-                'timeline': timeline,
-                'phases': 3,
-                'milestones': 5,
-                'resource_requirements': 'moderate'
-            }
-        return {'action': action, 'status': 'unknown_action'}
+        timeline = parameters.get('timeline', '1_month')
+        logger.info("Creating strategy for: %s", timeline)
+        return {
+            'action': 'create_strategy',
+            'timeline': timeline,
+            'phases': 3,
+            'milestones': 5,
+            'resource_requirements': 'moderate'
+        }
+
+    _ACTIONS = {'create_strategy': _create_strategy}
 
 
 class ExecutionAgent(BaseAgent):
@@ -212,20 +336,20 @@ class ExecutionAgent(BaseAgent):
         super().__init__(agent_id, AgentType.EXECUTOR)
         self.execution_count = 0
 
-    async def _perform_action(self, action: str, parameters: Dict) -> Dict:
+    async def _implement_plan(self, parameters: Dict) -> Dict:
         """Perform execution action"""
-        if action == "implement_plan":
-            resources = parameters.get('resources', 'basic')
-            self.execution_count += 1
-            logger.info(f"Implementing plan with resources: {resources}")
-            return {
-                'action': 'implement_plan',
-                'resources': resources,
-                'execution_count': self.execution_count,
-                'completion_percentage': 100,
-                'status': 'completed'
-            }
-        return {'action': action, 'status': 'unknown_action'}
+        resources = parameters.get('resources', 'basic')
+        self.execution_count += 1
+        logger.info("Implementing plan with resources: %s", resources)
+        return {
+            'action': 'implement_plan',
+            'resources': resources,
+            'execution_count': self.execution_count,
+            'completion_percentage': 100,
+            'status': 'completed'
+        }
+
+    _ACTIONS = {'implement_plan': _implement_plan}
 
 
 class AgentRegistry:
@@ -233,14 +357,30 @@ class AgentRegistry:
 
     def __init__(self):
         self.agents: Dict[str, BaseAgent] = {}
-        self.message_queue: List[Message] = []
-        self.task_queue: List[Task] = []
+        self.message_queue: Deque[Message] = deque(maxlen=MAX_QUEUE_SIZE)
+        self.task_queue: Deque[Task] = deque(maxlen=MAX_QUEUE_SIZE)
+        self.consumers: Dict[str, asyncio.Task] = {}
+        self.delivered_count = 0  # messages queued in any mailbox, used by drain()
         logger.info("Agent Registry initialized")
 
     def register_agent(self, agent: BaseAgent) -> None:
-        """Register an agent in the registry"""
+        """Register an agent and start its mailbox consumer"""
         self.agents[agent.agent_id] = agent
-        logger.info(f"Agent {agent.agent_id} registered")
+        try:
+            self.consumers[agent.agent_id] = asyncio.get_running_loop().create_task(
+                agent.run(self.send_message)
+            )
+        except RuntimeError:
+            # No running loop: messages wait in the mailbox until start_consumers()
+            pass
+        logger.info("Agent %s registered", agent.agent_id)
+
+    def start_consumers(self) -> None:
+        """Start mailbox consumers for agents registered outside an event loop"""
+        loop = asyncio.get_running_loop()
+        for agent_id, agent in self.agents.items():
+            if agent_id not in self.consumers:
+                self.consumers[agent_id] = loop.create_task(agent.run(self.send_message))
 
     def create_agent(self, agent_type: str) -> BaseAgent:
         """Create and register a new agent"""
@@ -263,18 +403,20 @@ class AgentRegistry:
     def send_message(self, message: Message) -> bool:
         """Send message from one agent to another"""
         if message.receiver_id not in self.agents:
-            logger.warning(f"Receiver {message.receiver_id} not found")
+            logger.warning("Receiver %s not found", message.receiver_id)
             return False
         
         receiver = self.agents[message.receiver_id]
-        receiver.receive_message(message)
-        logger.info(f"Message sent from {message.sender_id} to {message.receiver_id}")
+        if not receiver.receive_message(message):
+            return False
+        self.delivered_count += 1
+        logger.info("Message sent from %s to %s", message.sender_id, message.receiver_id)
         return True
 
     async def execute_task(self, task: Task) -> Dict:
         """Execute task on designated agent"""
         if task.agent_id not in self.agents:
-            logger.error(f"Agent {task.agent_id} not found")
+            logger.error("Agent %s not found", task.agent_id)
             return {'status': 'failed', 'error': 'Agent not found'}
         
         agent = self.agents[task.agent_id]
@@ -282,6 +424,10 @@ class AgentRegistry:
         self.task_queue.append(task)
         return result
 
+    async def execute_tasks(self, tasks: List[Task]) -> List[Dict]:
+        """Execute independent tasks concurrently, returning results in task order"""
+        return await asyncio.gather(*[self.execute_task(task) for task in tasks])
+
     def get_agent_status(self, agent_id: str) -> Optional[Dict]:
         """Get status of specific agent"""
         if agent_id not in self.agents:
@@ -293,10 +439,23 @@ class AgentRegistry:
         return {agent_id: agent.get_status() 
                 for agent_id, agent in self.agents.items()}
 
+    async def drain(self) -> None:
+        """Wait until every agent has processed all queued messages"""
+        # A reply can land in a mailbox that was already joined, so repeat until a
+        # whole pass delivers nothing new: then every mailbox is idle at once
+        while True:
+            delivered = self.delivered_count
+            await asyncio.gather(*[agent.mailbox.join() for agent in self.agents.values()])
+            if self.delivered_count == delivered:
+                return
+
     def shutdown_all(self) -> None:
         """Shutdown all agents"""
         for agent in self.agents.values():
             agent.shutdown()
+        for consumer in self.consumers.values():
+            consumer.cancel()
+        self.consumers.clear()
         logger.info("All agents shutdown")
 
 
@@ -339,15 +498,24 @@ async def main():
     )
     
     # Execute workflow
-    for task in [research_task, analyze_task, planning_task, execution_task]:
-        result = await registry.execute_task(task)
-        logger.info(f"Task {task.task_id}: {result}")
+    tasks = [research_task, analyze_task, planning_task, execution_task]
+    results = await registry.execute_tasks(tasks)
+    for task, result in zip(tasks, results):
+        logger.info("Task %s: %s", task.task_id, result)
+    
+    # Exchange a message over the agent bus
+    registry.send_message(Message(
+        sender_id=researcher.agent_id,
+        receiver_id=analyzer.agent_id,
+        content={'query': 'Share analysis status'}
+    ))
+    await registry.drain()
     
     # Display agent statuses
     logger.info("\n=== Agent Status ===")
     statuses = registry.get_all_agents_status()
     for agent_id, status in statuses.items():
-        logger.info(f"{agent_id}: {status}")
+        logger.info("%s: %s", agent_id, status)
     
     # Cleanup
     registry.shutdown_all()
@@ -6,10 +6,26 @@ Advanced Multi-Agent Framework with Gemini 2.5 Flash Integration
 import streamlit as st
 import os
 import asyncio
+import contextlib
+import functools
+import hashlib
+import math
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 import google.generativeai as genai
 from typing import Optional
 
+# Use uvloop's faster event loop when it is installed (not available on Windows)
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 # Page configuration
 st.set_page_config(
     page_title="🤖 Multi-Agent Task 3",
@@ -19,115 +35,277 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""<style>.agent-box {
+CUSTOM_CSS = """<style>.agent-box {
  padding: 1rem;
  border-radius: 10px;
  border: 2px solid #1f77b4;
  margin: 1rem 0;
  background-color: #f0f2f6;
-}</style>""", unsafe_allow_html=True)
+}</style>"""
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 # Initialize session state
 if 'agent_responses' not in st.session_state:
     st.session_state.agent_responses = {}
+if 'semantic_cache' not in st.session_state:
+    st.session_state.semantic_cache = []
 
 # Initialize Gemini API
 @st.cache_resource
 def initialize_gemini():
-    api_key = st.secrets.get("GEMINI_API_KEY")
+    """Configure the SDK once per process; returns (ok, error message)"""
+    try:
+        api_key = st.secrets.get("GEMINI_API_KEY")
+    except Exception as e:
+        return False, f"❌ API Error: {str(e)}"
     if not api_key:
-        return None
+        return False, "❌ API Key not found in secrets"
     genai.configure(api_key=api_key)
-    return genai
+    # Prime the connection in the background so the first real run starts warm
+    asyncio.run_coroutine_threadsafe(warm_up(get_model("gemini-2.5-flash")), get_event_loop())
+    return True, None
+
+async def warm_up(model):
+    """Open the Gemini channel with a free count_tokens call before the user hits Run"""
+    try:
+        if hasattr(model, "count_tokens_async"):
+            await model.count_tokens_async("warmup")
+        else:
+            await asyncio.to_thread(model.count_tokens, "warmup")
+    except Exception:
+        pass
+
+# Long-lived event loop shared by every session and rerun. The SDK's async gRPC
+# client is bound to the loop that created it, so running every Gemini call here
+# keeps one HTTP/2 channel alive instead of reconnecting on each run.
+@st.cache_resource
+def get_event_loop():
+    loop = asyncio.new_event_loop()
+    # Cache hits finish without suspending, so let them skip the scheduler (3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        loop.set_task_factory(asyncio.eager_task_factory)
+    threading.Thread(target=loop.run_forever, name="gemini-event-loop", daemon=True).start()
+    return loop
 
-# Multi-Agent Functions
-async def research_agent(task: str, model_name: str, temperature: float, max_tokens: int):
-    """Research Agent with optimized prompt"""
+# Cap on concurrent Gemini requests, so bursts stay under the per-minute quota
+def parse_max_parallel(value: Optional[str], default: int = 4) -> int:
+    """Read GEMINI_MAX_PARALLEL, falling back to default when it is unset or not a positive int"""
     try:
-        model = genai.GenerativeModel(model_name)
-        prompt = f"""You are an Expert Research Analyst with deep domain expertise.
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return limit if limit > 0 else default
+
+MAX_PARALLEL = parse_max_parallel(os.environ.get("GEMINI_MAX_PARALLEL"))
+
+class LoopSemaphore:
+    """asyncio.Semaphore built on first use, so it belongs to the loop thread that awaits it
+
+    Creating it on the script thread binds it to the wrong loop, and on Python 3.9
+    fails outright because that thread has no event loop.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore = None
+
+    def get(self) -> asyncio.Semaphore:
+        # Only called on the event loop thread, so no lock is needed
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+@st.cache_resource
+def get_gemini_semaphore():
+    """Process-wide cap of MAX_PARALLEL requests, shared by every session (the quota is per key)"""
+    return LoopSemaphore(MAX_PARALLEL)
+
+# Cached SDK objects, shared across reruns and sessions
+@st.cache_resource
+def get_model(model_name: str):
+    return genai.GenerativeModel(model_name)
+
+@st.cache_resource
+def get_generation_config(temperature: float, max_tokens: int):
+    return genai.types.GenerationConfig(
+        temperature=temperature,
+        max_output_tokens=max_tokens,
+    )
+
+async def stream_content(model, prompt, generation_config):
+    """Yield Gemini response text as it is generated, without blocking the event loop"""
+    if hasattr(model, "generate_content_async"):
+        response = await model.generate_content_async(
+            prompt, generation_config=generation_config, stream=True
+        )
+        async for chunk in response:
+            yield chunk.text
+    else:
+        # Older SDKs only ship the blocking call; keep it off the loop thread
+        response = await asyncio.to_thread(
+            model.generate_content, prompt, generation_config=generation_config
+        )
+        yield response.text
+
+# Exact response cache
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_TTL = 3600  # seconds
+SESSION_CACHE_MAX_ENTRIES = 128
+
+class ResponseCache:
+    """Thread-safe LRU of agent responses with optional expiry"""
+
+    def __init__(self, max_entries: int, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, response = entry
+            if self.ttl is not None and time.time() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+@st.cache_resource
+def get_response_cache():
+    """Process-wide cache, so identical requests from any session skip Gemini"""
+    return ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL)
+
+# Per-session copy of this user's results, unaffected by evictions from the shared cache
+if 'responses_by_key' not in st.session_state:
+    st.session_state.responses_by_key = ResponseCache(SESSION_CACHE_MAX_ENTRIES)
+
+def response_cache_key(prompt: str, model_name: str, temperature: float, max_tokens: int) -> str:
+    # Collapse whitespace so trivially reformatted tasks share an entry
+    normalized = " ".join(prompt.split())
+    return hashlib.sha256(f"{model_name}|{temperature}|{max_tokens}|{normalized}".encode()).hexdigest()
+
+# Semantic response cache
+EMBEDDING_MODEL = "models/text-embedding-004"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_TTL = 3600  # seconds
+# Each miss scans every entry on the shared loop thread, so keep the list short
+SEMANTIC_CACHE_MAX_ENTRIES = 64
+
+# In-flight embedding requests for this script run, so agents sharing a task embed it once
+_pending_embeddings = {}
+
+async def _embed(text: str):
+    if hasattr(genai, "embed_content_async"):
+        result = await genai.embed_content_async(model=EMBEDDING_MODEL, content=text)
+    else:
+        result = await asyncio.to_thread(genai.embed_content, model=EMBEDDING_MODEL, content=text)
+    return result["embedding"]
+
+async def embed_task(task: str):
+    """Embed a task, sharing one request between concurrently running agents"""
+    if task not in _pending_embeddings:
+        _pending_embeddings[task] = asyncio.ensure_future(_embed(task))
+    return await _pending_embeddings[task]
+
+def cosine_similarity(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+def semantic_cache(agent_func):
+    """Serve an agent's previous response when a near-identical task was already answered
+
+    The wrapped function returns (response, from_cache); from_cache is True when the
+    response was answered for a similar task rather than generated for this one.
+    """
+    @functools.wraps(agent_func)
+    async def wrapper(kind, task: str, model, generation_config, *args, cache=None, **kwargs):
+        if cache is None:
+            return await agent_func(kind, task, model, generation_config, *args, **kwargs), False
+        try:
+            vector = await embed_task(task)
+        except Exception:
+            # Embedding failures should never block the agent itself
+            return await agent_func(kind, task, model, generation_config, *args, **kwargs), False
+
+        now = time.time()
+        settings = (model.model_name, generation_config, kwargs.get('concise', False))
+        cache[:] = [entry for entry in cache if now - entry['created_at'] < SEMANTIC_CACHE_TTL]
+
+        best_score, best_entry = 0.0, None
+        for entry in cache:
+            if entry['agent'] != kind or entry['settings'] != settings:
+                continue
+            score = cosine_similarity(vector, entry['embedding'])
+            if score > best_score:
+                best_score, best_entry = score, entry
+        if best_entry is not None and best_score >= SEMANTIC_CACHE_THRESHOLD:
+            return best_entry['response'], True
+
+        response = await agent_func(kind, task, model, generation_config, *args, **kwargs)
+        if not is_complete_response(kind, response):
+            return response, False
+        cache.append({
+            'agent': kind,
+            'settings': settings,
+            'embedding': vector,
+            'response': response,
+            'created_at': now,
+        })
+        # Entries are appended in creation order, so the oldest are at the front
+        del cache[:-SEMANTIC_CACHE_MAX_ENTRIES]
+        return response, False
+    return wrapper
+
+# Agent prompt templates
+PROMPTS = {
+    "research": """You are an Expert Research Analyst with deep domain expertise.
 
 TASK: {task}
 
-Conduct comprehensive research and provide:
+Research the task and provide, in at most 150 words per section:
 1. Executive Summary - Clear answer to the task
 2. Methodology - How you arrived at the answer
-3. Detailed Findings - Step-by-step breakdown
+3. Key Findings - The essential steps only
 4. Verification - Double-check of your work
 
-Focus on accuracy and completeness."""
-        
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-            )
-        )
-        return response.text
-    except Exception as e:
-        return f"Error: {str(e)}"
-
-async def analysis_agent(task: str, model_name: str, temperature: float, max_tokens: int):
-    """Analysis Agent with comprehensive breakdown"""
-    try:
-        model = genai.GenerativeModel(model_name)
-        prompt = f"""You are a Strategic Business Analyst with deep problem-solving expertise.
+Focus on accuracy; skip background the task does not need.""",
+    "analysis": """You are a Strategic Business Analyst with deep problem-solving expertise.
 
 TASK: {task}
 
-Provide comprehensive analysis:
+Provide a focused analysis, in at most 150 words per section:
 1. Problem Breakdown - Core components and scope
-2. Component Analysis - Detailed examination of each part
+2. Component Analysis - The key points of each part
 3. Solution Methodology - Step-by-step approach
 4. Verification - Confirm the solution is correct
 
-Ensure complete accuracy in all calculations."""
-        
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-            )
-        )
-        return response.text
-    except Exception as e:
-        return f"Error: {str(e)}"
-
-async def planning_agent(task: str, model_name: str, temperature: float, max_tokens: int):
-    """Planning Agent with strategic framework"""
-    try:
-        model = genai.GenerativeModel(model_name)
-        prompt = f"""You are a Strategic Planning Expert.
+Ensure complete accuracy in all calculations.""",
+    "planning": """You are a Strategic Planning Expert.
 
 TASK: {task}
 
-Create a comprehensive strategic plan:
+Create a strategic plan, in at most 150 words per section:
 1. Phase Definition - Major phases with clear objectives
 2. Milestone Planning - Key checkpoints and success criteria
 3. Resource Requirements - What's needed to succeed
 4. Timeline Estimation - Realistic timeframes
 5. Risk Assessment - Potential challenges and solutions
 
-Be thorough and detailed in your planning."""
-        
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-            )
-        )
-        return response.text
-    except Exception as e:
-        return f"Error: {str(e)}"
-
-async def execution_agent(task: str, model_name: str, temperature: float, max_tokens: int):
-    """Execution Agent with implementation guidance"""
-    try:
-        model = genai.GenerativeModel(model_name)
-        prompt =prompt = f"""Execute this task step-by-step.
+Be specific and skip generic advice.""",
+    "execution": """Execute this task step-by-step.
 
 TASK: {task}
 
@@ -135,18 +313,96 @@ Provide:
 1. Clear calculation steps
 2. Final answer
 
-Be concise and complete."""
-        
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-            )
-        )
-        return response.text
-    except Exception as e:
-        return f"Error: {str(e)}"
+Be concise and complete.""",
+}
+
+# Split each template around its {task} slot once, so building a prompt is a plain concatenation
+PROMPT_PARTS = {kind: tuple(template.split("{task}", 1)) for kind, template in PROMPTS.items()}
+
+AGENT_NAMES = {
+    "research": "Research Agent",
+    "analysis": "Analysis Agent",
+    "planning": "Planning Agent",
+    "execution": "Execution Agent",
+}
+
+# Fused mode: one call that writes every enabled agent's section under its own heading
+FUSED_PROMPT_PARTS = tuple("""You are a team of expert agents working together on one task.
+
+TASK: {task}
+
+Write each section below, in order. Start every section with its heading line exactly as shown \
+and do not add any other "## " headings.""".split("{task}", 1))
+FUSED_SECTIONS = {
+    kind: f"## {AGENT_NAMES[kind]}\n" + template.replace("TASK: {task}\n\n", "")
+    for kind, template in PROMPTS.items()
+}
+FUSED_SECTION_RE = re.compile(
+    r"^## (" + "|".join(re.escape(name) for name in AGENT_NAMES.values()) + r")\s*$", re.M
+)
+# Upper bound on a fused call's output budget (the smallest limit of the selectable models)
+FUSED_MAX_TOKENS = 8192
+
+# Concise mode: shorter answers under a tighter token cap
+CONCISE_PREFIX = "Be terse.\n\n"
+CONCISE_MAX_TOKENS = 512
+
+def build_prompt(kind, task: str, concise: bool = False) -> str:
+    """Build the prompt for one agent kind, or for a tuple of kinds in fused mode"""
+    if isinstance(kind, tuple):
+        prefix, suffix = FUSED_PROMPT_PARTS
+        prompt = prefix + task + suffix + "".join("\n\n" + FUSED_SECTIONS[k] for k in kind)
+    else:
+        prefix, suffix = PROMPT_PARTS[kind]
+        prompt = prefix + task + suffix
+    return CONCISE_PREFIX + prompt if concise else prompt
+
+def split_fused_response(text: str) -> dict:
+    """Map each agent name to the body of its section in a fused response"""
+    parts = FUSED_SECTION_RE.split(text)
+    # parts is [preamble, name, body, name, body, ...]
+    return {name: body.strip() for name, body in zip(parts[1::2], parts[2::2])}
+
+def is_complete_response(kind, text: str) -> bool:
+    """Whether a response has every section it was asked for; only complete ones are cached"""
+    if not isinstance(kind, tuple):
+        return True
+    return {AGENT_NAMES[k] for k in kind} <= split_fused_response(text).keys()
+
+def job_max_tokens(kind, max_tokens: int) -> int:
+    """Output budget for one call; fused calls get max_tokens for each section they write"""
+    if not isinstance(kind, tuple):
+        return max_tokens
+    return min(max_tokens * len(kind), FUSED_MAX_TOKENS)
+
+# Multi-Agent Function
+@semantic_cache
+async def run_agent(kind, task: str, model, generation_config, on_chunk=None, semaphores=(),
+                    concise=False):
+    """Run the agent whose prompt template is PROMPTS[kind] (or a fused call for a tuple of kinds)
+
+    Runs on the shared event loop thread, so it must not touch Streamlit directly.
+    on_chunk, if given, is called with the text received so far after every streamed chunk.
+    semaphores are acquired in order and held for the duration of the Gemini request.
+    concise prepends CONCISE_PREFIX to the prompt.
+    cache, accepted via @semantic_cache, is the list of semantic cache entries to consult.
+    API errors propagate so the caller can report them against this agent.
+    Returns (response, from_cache), see @semantic_cache.
+    """
+    prompt = build_prompt(kind, task, concise)
+
+    async def collect():
+        text = ""
+        async for chunk in stream_content(model, prompt, generation_config=generation_config):
+            text += chunk
+            if on_chunk is not None:
+                on_chunk(text)
+        return text
+
+    async with contextlib.AsyncExitStack() as stack:
+        for semaphore in semaphores:
+            await stack.enter_async_context(semaphore)
+        return await collect()
 
 # Main UI
 st.title("🤖 Multi-Agent AI System - Task 3")
@@ -166,6 +422,12 @@ with st.sidebar:
     analyzer_enabled = st.checkbox("📊 Analysis Agent", value=True)
     planner_enabled = st.checkbox("📋 Planning Agent", value=True)
     executor_enabled = st.checkbox("⚡ Execution Agent", value=True)
+    enabled_count = sum([researcher_enabled, analyzer_enabled, planner_enabled, executor_enabled])
+    fused_mode = st.checkbox(
+        "⚡ Fused single-call mode",
+        value=enabled_count >= 3,
+        help="Ask Gemini for every agent's section in one request, with Max Tokens for each section."
+    )
     
     st.divider()
     
@@ -206,23 +468,39 @@ with st.sidebar:
         "Max Tokens",
         min_value=100,
         max_value=4096,
-        value=4000,
+        value=1024,
         step=100
     )
     
+    concise = st.checkbox(
+        "Concise mode",
+        value=False,
+        help=f"Ask for terse answers and cap output at {CONCISE_MAX_TOKENS} tokens."
+    )
+    if concise:
+        max_tokens = min(max_tokens, CONCISE_MAX_TOKENS)
+    
+    # Per-session limit within the app-wide MAX_PARALLEL cap (a slider needs min < max)
+    max_parallel = MAX_PARALLEL
+    if MAX_PARALLEL > 1:
+        max_parallel = st.slider(
+            "Max parallel Gemini calls",
+            min_value=1,
+            max_value=MAX_PARALLEL,
+            value=MAX_PARALLEL,
+            help="Limits this session's concurrent calls. The app-wide cap is set by GEMINI_MAX_PARALLEL; raise it if your API tier has a higher rate limit."
+        )
+    
     st.divider()
     
     # API Status
     st.subheader("📊 API Status")
-    try:
-        api_key = st.secrets.get("GEMINI_API_KEY")
-        if api_key:
-            genai.configure(api_key=api_key)
-            st.success("✅ Gemini API Connected")
-        else:
-            st.error("❌ API Key not found in secrets")
-    except Exception as e:
-        st.error(f"❌ API Error: {str(e)}")
+    # Configured once; reconfiguring on every rerun would drop the SDK's open connection
+    gemini_ready, gemini_error = initialize_gemini()
+    if gemini_ready:
+        st.success("✅ Gemini API Connected")
+    else:
+        st.error(gemini_error)
 
 # ============ MAIN CONTENT AREA ============
 # Tabs
@@ -247,48 +525,172 @@ with tab1:
     
     if clear_button:
         st.session_state.agent_responses = {}
+        st.session_state.pop("last_run_sig", None)
         st.rerun()
     
-    if run_button and task_input:
+    agents_to_run = []
+    if researcher_enabled:
+        agents_to_run.append(("Research Agent", "research", "🔍"))
+    if analyzer_enabled:
+        agents_to_run.append(("Analysis Agent", "analysis", "📊"))
+    if planner_enabled:
+        agents_to_run.append(("Planning Agent", "planning", "📋"))
+    if executor_enabled:
+        agents_to_run.append(("Execution Agent", "execution", "⚡"))
+    agent_emojis = {agent_name: emoji for agent_name, _, emoji in agents_to_run}
+    
+    # Everything that affects the output; an unchanged signature means nothing to rerun
+    run_signature = (task_input, model_name, temperature, max_tokens, concise, fused_mode,
+                     tuple(agent_name for agent_name, _, _ in agents_to_run))
+    up_to_date = (st.session_state.get("last_run_sig") == run_signature
+                  and st.session_state.agent_responses.keys() == agent_emojis.keys())
+    
+    if run_button and task_input and up_to_date:
+        st.info("✅ Results up-to-date — showing cached outputs.")
+        for idx, (agent_name, response) in enumerate(st.session_state.agent_responses.items()):
+            with st.expander(f"{agent_emojis[agent_name]} {agent_name} - COMPLETED ✅", expanded=(idx < 1)):
+                st.markdown(response)
+    
+    elif run_button and task_input:
+        # The saved signature describes agent_responses, which this run is about to replace
+        st.session_state.pop("last_run_sig", None)
         progress_bar = st.progress(0)
         status_placeholder = st.empty()
         
-        agents_to_run = []
-        if researcher_enabled:
-            agents_to_run.append(("Research Agent", research_agent, "🔍"))
-        if analyzer_enabled:
-            agents_to_run.append(("Analysis Agent", analysis_agent, "📊"))
-        if planner_enabled:
-            agents_to_run.append(("Planning Agent", planning_agent, "📋"))
-        if executor_enabled:
-            agents_to_run.append(("Execution Agent", execution_agent, "⚡"))
-        
         total_agents = len(agents_to_run)
         st.session_state.agent_responses = {}
         
-        for idx, (agent_name, agent_func, emoji) in enumerate(agents_to_run):
-            status_placeholder.info(f"{emoji} {agent_name} is running...")
-            
+        # One slot per agent, in display order, so concurrent streams render side by side
+        agent_slots = {agent_name: st.empty() for agent_name, _, _ in agents_to_run}
+
+        # Calls run on the shared loop thread; Streamlit calls stay on this script
+        # thread, so progress is handed over through a thread-safe queue.
+        model = get_model(model_name)
+        cache = st.session_state.semantic_cache
+        shared_semaphore = get_gemini_semaphore()
+        events = queue.Queue()
+
+        # A job is one Gemini call: a single agent, or every agent at once in fused mode
+        if fused_mode and total_agents > 1:
+            jobs = [(tuple(kind for _, kind, _ in agents_to_run), [agent_name for agent_name, _, _ in agents_to_run])]
+        else:
+            jobs = [(kind, [agent_name]) for agent_name, kind, _ in agents_to_run]
+        job_tokens = [job_max_tokens(kind, max_tokens) for kind, _ in jobs]
+        generation_configs = [get_generation_config(temperature, tokens) for tokens in job_tokens]
+
+        def split_job_response(job_id, text):
+            kind, agent_names = jobs[job_id]
+            return split_fused_response(text) if isinstance(kind, tuple) else {agent_names[0]: text}
+
+        # Exact repeats are answered from this session's own results first, then the
+        # process-wide cache, without touching the loop
+        response_cache = get_response_cache()
+        session_cache = st.session_state.responses_by_key
+        cache_keys = [
+            response_cache_key(build_prompt(kind, task_input, concise), model_name, temperature, tokens)
+            for (kind, _), tokens in zip(jobs, job_tokens)
+        ]
+        pending_jobs = []
+        for job_id in range(len(jobs)):
+            cached = session_cache.get(cache_keys[job_id])
+            if cached is None:
+                cached = response_cache.get(cache_keys[job_id])
+                if cached is not None:
+                    session_cache.put(cache_keys[job_id], cached)
+            if cached is None:
+                pending_jobs.append(job_id)
+            else:
+                events.put(("cached", job_id, cached))
+
+        async def _run_one(job_id, semaphores):
             try:
-                response = asyncio.run(agent_func(task_input, model_name, temperature, max_tokens))
-                st.session_state.agent_responses[agent_name] = response
-                
-                with st.expander(f"{emoji} {agent_name} - COMPLETED ✅", expanded=(idx < 1)):
-                    st.markdown(response)
-                
+                response, from_cache = await run_agent(
+                    jobs[job_id][0], task_input, model, generation_configs[job_id],
+                    on_chunk=lambda text: events.put(("partial", job_id, text)),
+                    semaphores=semaphores,
+                    concise=concise,
+                    cache=cache,
+                )
+                # Only fresh Gemini output goes into the exact caches; a semantic hit
+                # answered a different task and keeps its own expiry
+                events.put(("cached" if from_cache else "done", job_id, response))
             except Exception as e:
-                st.error(f"❌ Error in {agent_name}: {str(e)}")
-            
-            progress_bar.progress((idx + 1) / total_agents)
+                events.put(("error", job_id, e))
+
+        async def _run_all():
+            # Semaphores are built here, on the loop thread that awaits them. This run's
+            # own limit is taken first, then the shared cap, always in that order.
+            semaphores = (asyncio.Semaphore(max_parallel), shared_semaphore.get())
+            # Dispatch every job at once
+            await asyncio.gather(*[_run_one(job_id, semaphores) for job_id in pending_jobs])
+
+        status_placeholder.info(f"🔄 Running {total_agents} agents in parallel...")
+        future = asyncio.run_coroutine_threadsafe(_run_all(), get_event_loop())
+        finished = failed = 0
+        while finished < total_agents:
+            try:
+                batch = [events.get(timeout=0.1)]
+            except queue.Empty:
+                if future.done() and events.empty():
+                    future.result()  # re-raise anything that escaped _run_one
+                    break
+                continue
+            # Take everything already queued, so a slow rerender never works through stale
+            # partials: only the newest event of each job is drawn
+            while True:
+                try:
+                    batch.append(events.get_nowait())
+                except queue.Empty:
+                    break
+            last_event = {job_id: i for i, (_, job_id, _) in enumerate(batch)}
+
+            for i, (event, job_id, payload) in enumerate(batch):
+                agent_names = jobs[job_id][1]
+                if event == "partial":
+                    if last_event[job_id] != i:
+                        continue  # superseded by a later event for this job
+                    for agent_name, text in split_job_response(job_id, payload).items():
+                        if agent_name not in agent_slots:
+                            continue
+                        with agent_slots[agent_name].container():
+                            with st.expander(f"{agent_emojis[agent_name]} {agent_name} - RUNNING ⏳", expanded=True):
+                                st.markdown(text)
+                    continue
+
+                # A truncated fused reply is shown but not cached, so the next run retries it
+                if event == "done" and is_complete_response(jobs[job_id][0], payload):
+                    response_cache.put(cache_keys[job_id], payload)
+                    session_cache.put(cache_keys[job_id], payload)
+                sections = split_job_response(job_id, payload) if event != "error" else {}
+                for agent_name in agent_names:
+                    emoji, slot = agent_emojis[agent_name], agent_slots[agent_name]
+                    if agent_name in sections:
+                        st.session_state.agent_responses[agent_name] = sections[agent_name]
+                        with slot.container():
+                            with st.expander(f"{emoji} {agent_name} - COMPLETED ✅", expanded=(finished < 1)):
+                                st.markdown(sections[agent_name])
+                    else:
+                        error = payload if event == "error" else "section missing from fused response"
+                        slot.error(f"❌ Error in {agent_name}: {str(error)}")
+                        failed += 1
+                    finished += 1
+                progress_bar.progress(finished / total_agents)
+                if finished < total_agents:
+                    status_placeholder.info(f"🔄 {finished}/{total_agents} agents finished...")
         
-        status_placeholder.success("✅ All agents completed successfully!")
+        if failed:
+            status_placeholder.warning(f"⚠️ {failed} of {total_agents} agents failed")
+        else:
+            status_placeholder.success("✅ All agents completed successfully!")
+            st.session_state.last_run_sig = run_signature
+        st.session_state.last_run_ts = datetime.now().strftime(TIMESTAMP_FORMAT)
 
 with tab2:
     st.subheader("Task History & Responses")
     if st.session_state.agent_responses:
         st.markdown(f"**Task:** {task_input}")
         st.markdown(f"**Model:** {model_name}")
-        st.markdown(f"**Timestamp:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        st.markdown(f"**Timestamp:** {st.session_state.get('last_run_ts', '')}")
         st.divider()
         
         for agent_name, response in st.session_state.agent_responses.items():